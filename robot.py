@@ -1,13 +1,17 @@
-from flask import Flask, render_template, Response, jsonify
+from flask import Flask, render_template, Response, jsonify, request
 
 import cv2
-import mediapipe as mp
 import numpy as np
 import time
 import random
 import math
+import os
+import gzip
+import asyncio
+import itertools
 import threading
 from threading import Lock, Thread
+from collections import deque
 import queue
 
 # ======================================================
@@ -15,6 +19,130 @@ import queue
 # ======================================================
 app = Flask(__name__)
 
+# ======================================================
+# FRAME TRACING (Chrome trace-event export)
+# ======================================================
+TRACE_FRAMES = False           # Opt-in; can also be toggled via /debug/trace/start
+TRACE_BUFFER_SIZE = 20000      # Ring buffer size (events)
+
+class _NullFrameTrace:
+    """Shared no-op trace handed out while tracing is disabled"""
+    __slots__ = ()
+
+    def mark(self, stage, frame_id=None):
+        pass
+
+_NULL_FRAME_TRACE = _NullFrameTrace()
+
+class _FrameTrace:
+    """Splits one frame's trip through a pipeline into consecutive stages"""
+    __slots__ = ("tracer", "pipeline", "frame_id", "last")
+
+    def __init__(self, tracer, pipeline):
+        self.tracer = tracer
+        self.pipeline = pipeline
+        self.frame_id = None
+        self.last = time.perf_counter()
+
+    def mark(self, stage, frame_id=None):
+        """Record the time since the previous mark as `stage`"""
+        now = time.perf_counter()
+        if frame_id is not None:
+            self.frame_id = frame_id
+        self.tracer.record(stage, self.pipeline, self.last, now, self.frame_id)
+        self.last = now
+
+class FrameTracer:
+    def __init__(self, enabled=TRACE_FRAMES, capacity=TRACE_BUFFER_SIZE):
+        self.enabled = enabled
+        self.events = deque(maxlen=capacity)
+        self.thread_names = {}
+        self.frame_ids = itertools.count(1)
+        self.pid = os.getpid()
+
+    def next_frame_id(self):
+        return next(self.frame_ids)
+
+    def frame(self, pipeline):
+        if not self.enabled:
+            return _NULL_FRAME_TRACE
+        return _FrameTrace(self, pipeline)
+
+    def record(self, name, category, start, end, frame_id=None, **args):
+        if not self.enabled:
+            return
+        tid = threading.get_ident()
+        if tid not in self.thread_names:
+            self.thread_names[tid] = threading.current_thread().name
+        if frame_id is not None:
+            args["frame"] = frame_id
+        # deque.append is atomic, no lock needed on the hot path
+        self.events.append((name, category, start, end, tid, args))
+
+    def instant(self, name, category, frame_id=None):
+        if self.enabled:
+            now = time.perf_counter()
+            self.record(name, category, now, now, frame_id)
+
+    def span(self, name, category, **args):
+        return _TraceSpan(self, name, category, args) if self.enabled else _NULL_SPAN
+
+    def start(self):
+        self.events.clear()
+        self.enabled = True
+
+    def stop(self):
+        self.enabled = False
+
+    def chrome_trace(self):
+        """Dump the ring buffer as Chrome trace-event JSON (chrome://tracing, Perfetto)"""
+        events = [
+            {"name": "thread_name", "ph": "M", "pid": self.pid, "tid": tid, "args": {"name": name}}
+            for tid, name in list(self.thread_names.items())
+        ]
+        for name, category, start, end, tid, args in list(self.events):
+            events.append({
+                "name": name,
+                "cat": category,
+                "ph": "X" if end > start else "i",
+                "ts": start * 1e6,
+                "dur": (end - start) * 1e6,
+                "pid": self.pid,
+                "tid": tid,
+                "args": args
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+class _TraceSpan:
+    __slots__ = ("tracer", "name", "category", "args", "start")
+
+    def __init__(self, tracer, name, category, args):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.record(self.name, self.category, self.start, time.perf_counter(), **self.args)
+        return False
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+tracer = FrameTracer()
+
 # ======================================================
 # ROBOT CONTROLLER (SERIAL COMM)
 # ======================================================
@@ -64,7 +192,7 @@ class RobotController:
     def send_command(self, cmd):
         if not self.ser: return
         try:
-            with self.lock:
+            with self.lock, tracer.span("serial_send", "robot", cmd=cmd):
                 full_cmd = f"{cmd}\n"
                 self.ser.write(full_cmd.encode('utf-8'))
         except Exception as e:
@@ -92,7 +220,75 @@ game_locks = {
 FRAME_W, FRAME_H = 640, 480
 PROCESS_W, PROCESS_H = 320, 240
 
-air_points = []
+AIR_MAX_POINTS = 1024         # Max points kept per stroke (oldest are dropped)
+AIR_POINT_SPACING = 4.0       # Resample strokes to one point every N pixels
+# Strokes are resampled, so point counts measure path length, not drawing time
+AIR_MIN_SHAPE_PX = 60         # Shortest stroke (path length in px) worth classifying
+AIR_MIN_ATTEMPT_PX = 40       # Unrecognised strokes longer than this count as a wrong attempt
+
+class StrokeBuffer:
+    """
+    Bounded stroke store. Points are resampled at a fixed spacing as they
+    arrive and kept in a preallocated ring. Every point is written twice
+    (slot i and i + capacity) so the live stroke is always one contiguous
+    slice: points() / int_points() return views, never copies.
+    """
+    def __init__(self, capacity=AIR_MAX_POINTS, spacing=AIR_POINT_SPACING):
+        self.capacity = capacity
+        self.spacing = spacing
+        self.pts = np.zeros((2 * capacity, 2), dtype=np.float32)
+        self.ipts = np.zeros((2 * capacity, 2), dtype=np.int32)   # cv2 drawing needs int32
+        self.start = 0
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def length(self):
+        """Path length in pixels (resampled points are exactly `spacing` apart)"""
+        return max(0, self.count - 1) * self.spacing
+
+    def _write(self, new_pts):
+        n = len(new_pts)
+        if n > self.capacity:
+            new_pts = new_pts[-self.capacity:]
+            n = self.capacity
+        idx = (self.start + self.count + np.arange(n)) % self.capacity
+        ipts = np.rint(new_pts).astype(np.int32)
+        self.pts[idx] = new_pts
+        self.pts[idx + self.capacity] = new_pts
+        self.ipts[idx] = ipts
+        self.ipts[idx + self.capacity] = ipts
+        overflow = max(0, self.count + n - self.capacity)
+        self.start = (self.start + overflow) % self.capacity
+        self.count = min(self.capacity, self.count + n)
+
+    def add(self, x, y):
+        p = np.array([x, y], dtype=np.float32)
+        if self.count == 0:
+            self._write(p[None])
+            return
+        last = self.pts[self.start + self.count - 1]
+        dist = float(np.hypot(*(p - last)))
+        if dist < self.spacing:
+            return  # Jitter, don't grow the stroke
+        # Fill the gap with evenly spaced points so fast moves keep their shape
+        steps = np.arange(1, int(dist // self.spacing) + 1, dtype=np.float32) * (self.spacing / dist)
+        self._write(last + (p - last) * steps[:, None])
+
+    def points(self):
+        """(n, 2) float32 view of the stroke, oldest first"""
+        return self.pts[self.start:self.start + self.count]
+
+    def int_points(self):
+        """(n, 2) int32 view of the stroke for drawing"""
+        return self.ipts[self.start:self.start + self.count]
+
+    def clear(self):
+        self.start = 0
+        self.count = 0
+
+air_points = StrokeBuffer()
 air_drawing_active = False
 air_hand_present = False
 air_last_hand_present = False
@@ -112,6 +308,18 @@ EPIC_MAP = {
 face_present = False
 face_fps = 0
 
+# Face pipeline tuning (trade accuracy for FPS here)
+FACE_TARGET_FPS = 30          # Frame rate the detector input size adapts to
+FACE_DETECT_SHARE = 0.6       # Share of the frame budget the detector may use
+FACE_MIN_INPUT_W = 160        # Smallest full-frame detector input width
+FACE_MAX_INPUT_W = 640        # Largest full-frame detector input width
+FACE_ROI_MARGIN = 0.35        # Crop padding around the last face box (fraction of box size)
+FACE_ROI_INPUT_W = 256        # Max crop width fed to the refining detector
+FACE_MIN_ROI_INPUT_W = 128    # Smallest crop width before refinement is dropped
+FACE_REFINE = True            # Iris / lip refinement on the face crop (turned off if over budget)
+FACE_ADAPT_FRAMES = 15        # Consecutive over / under budget frames before changing settings
+FACE_MAX_FACES = 2
+
 DIVINE_CHARACTERS = [
     "Shiva", "Vishnu", "Krishna", "Rama", "Ganesha", "Hanuman",
     "Durga", "Kali", "Lakshmi", "Saraswati", "Parvati",
@@ -151,11 +359,17 @@ class GameState:
     DETECTING = 2
     RESULT = 3
 
+RPS_PLAYERS = 1            # 2 = two players face off (left vs right half of the frame)
+RPS_VOTE_FRAMES = 7        # Frames in the majority vote window
+RPS_VOTE_MIN_CONF = 0.6    # Share of the window the winning move must hold
+RPS_MOVES = ("Rock", "Paper", "Scissors")
+
 rps_state = GameState.IDLE
 rps_countdown_start = 0
 rps_player_move = None
 rps_computer_move = None
 rps_winner = None
+rps_confidence = 0.0
 
 # ======================================================
 # FRAME BUFFER SYSTEM (Thread-safe camera frame sharing)
@@ -163,17 +377,34 @@ rps_winner = None
 class FrameBuffer:
     def __init__(self):
         self.frame = None
+        self.frame_id = None
         self.lock = Lock()
+        self.new_frame = threading.Condition(self.lock)
     
-    def update(self, frame):
+    def update(self, frame, frame_id=None):
         with self.lock:
             self.frame = frame
+            self.frame_id = frame_id
+            self.new_frame.notify_all()
     
     def get(self):
+        return self.get_tagged()[0]
+
+    def get_tagged(self):
+        """Return (frame copy, frame id) so pipelines can trace the frame"""
         with self.lock:
             if self.frame is not None:
-                return self.frame.copy()
-            return None
+                return self.frame.copy(), self.frame_id
+            return None, None
+
+    def wait_new(self, last_id, timeout=0.5):
+        """
+        Wait for a frame newer than `last_id`. Gives up after `timeout` so
+        streams keep serving the stale frame while the camera reconnects.
+        """
+        with self.lock:
+            if self.frame is None or self.frame_id == last_id:
+                self.new_frame.wait(timeout)
 
 # Global frame buffers for each game
 air_frame_buffer = FrameBuffer()
@@ -186,124 +417,679 @@ stop_face_reader = threading.Event()
 stop_rps_reader = threading.Event()
 
 # ======================================================
-# MEDIAPIPE SETUP
+# INFERENCE BACKEND SETUP
 # ======================================================
-MEDIAPIPE_AVAILABLE = False
-try:
-    # Try importing solutions explicitly for some versions
-    import mediapipe.python.solutions as mp_solutions
-    mp_hands = mp_solutions.hands
-    mp_face = mp_solutions.face_mesh
-    mp_draw = mp_solutions.drawing_utils
-    MEDIAPIPE_AVAILABLE = True
-except (ImportError, AttributeError):
-    try:
-        # Standard import fallback
-        mp_hands = mp.solutions.hands
-        mp_face = mp.solutions.face_mesh
-        mp_draw = mp.solutions.drawing_utils
-        MEDIAPIPE_AVAILABLE = True
-    except (ImportError, AttributeError):
-        print("!!! WARNING: MediaPipe could not be loaded. AI features will be disabled. !!!")
-        MEDIAPIPE_AVAILABLE = False
-
-if MEDIAPIPE_AVAILABLE:
-    hand_detector = mp_hands.Hands(
-        max_num_hands=1,
-        model_complexity=0,
-        min_detection_confidence=0.6,
-        min_tracking_confidence=0.6
-    )
-
-    face_mesh_detector = mp_face.FaceMesh(
-        static_image_mode=False,
-        max_num_faces=2,
-        refine_landmarks=True,
-        min_detection_confidence=0.6,
-        min_tracking_confidence=0.6
-    )
-else:
-    hand_detector = None
-    face_mesh_detector = None
+# Which landmark backend to use: "mediapipe", "onnx" or "auto"
+# ("auto" prefers MediaPipe and falls back to the ONNX CPU backend)
+INFERENCE_BACKEND = "auto"
+
+# ONNX CPU landmark backend settings (used when MediaPipe is unavailable
+# or INFERENCE_BACKEND = "onnx")
+# (see README "Inference backend" for where these models come from)
+ONNX_PALM_MODEL = "models/palm_detection_lite.onnx"
+ONNX_HAND_MODEL = "models/hand_landmark_lite.onnx"
+ONNX_FACE_DETECTOR = "models/face_detection_yunet_2023mar.onnx"
+ONNX_FACE_MODEL = "models/face_landmark.onnx"
+ONNX_THREADS = 2              # intra-op threads per model (ONNX Runtime only)
+ONNX_MAX_BATCH = 4            # max frames / crops fused into one call
+ONNX_BATCH_WINDOW_MS = 4      # how long to wait for more frames to batch
+ONNX_MIN_DETECTION = 0.5      # min palm / face detector score
+ONNX_MIN_PRESENCE = 0.6       # min landmark presence score to report a hand/face
+# Which model output holds what (indices in the graph's output order), and
+# whether the presence score is a raw logit (tf2onnx conversions of the
+# MediaPipe tflite models: face_landmark emits a logit, hand_landmark_lite
+# a probability; the palm detector's scores are always logits)
+ONNX_PALM_OUTPUTS = {"boxes": 0, "scores": 1}
+ONNX_HAND_OUTPUTS = {"landmarks": 0, "score": 1, "score_is_logit": False}
+ONNX_FACE_OUTPUTS = {"landmarks": 0, "score": 1, "score_is_logit": True}
+
+# Hand skeleton used for drawing (same topology as mediapipe HAND_CONNECTIONS)
+HAND_CONNECTIONS = (
+    (0, 1), (1, 2), (2, 3), (3, 4),
+    (0, 5), (5, 6), (6, 7), (7, 8),
+    (5, 9), (9, 10), (10, 11), (11, 12),
+    (9, 13), (13, 14), (14, 15), (15, 16),
+    (13, 17), (0, 17), (17, 18), (18, 19), (19, 20)
+)
+
+class Landmark:
+    """Normalized landmark, attribute compatible with mediapipe's protos"""
+    __slots__ = ("x", "y", "z")
+
+    def __init__(self, x, y, z=0.0):
+        self.x = x
+        self.y = y
+        self.z = z
+
+class LandmarkList:
+    """Minimal stand-in for mediapipe's NormalizedLandmarkList"""
+    __slots__ = ("landmark", "array")
+
+    def __init__(self, landmark, array=None):
+        self.landmark = landmark
+        self.array = array      # (points, 3) float32, when the backend has one
+
+    @classmethod
+    def from_array(cls, arr):
+        return cls([Landmark(float(x), float(y), float(z)) for x, y, z in arr], arr)
+
+class InferenceBackend:
+    """
+    Common interface for hand / face landmark detectors.
+    detect_* take an RGB frame and return a list of landmark lists
+    (objects with a `.landmark` sequence of normalized x/y/z points).
+    `session` keeps tracking state apart for each game / camera.
+    """
+    name = "none"
+    available = False
+    max_hands = 0           # Most hands one detect_hands call can report
+
+    def detect_hands(self, rgb, session="default", max_hands=1):
+        return []
+
+    def detect_faces(self, rgb, session="default", max_faces=1, refine=True):
+        return []
+
+    def detect_hands_batch(self, frames, session="default", max_hands=1):
+        return [self.detect_hands(rgb, session, max_hands) for rgb in frames]
+
+    def detect_faces_batch(self, frames, session="default", max_faces=1, refine=True):
+        return [self.detect_faces(rgb, session, max_faces, refine) for rgb in frames]
+
+class MediaPipeBackend(InferenceBackend):
+    """MediaPipe solutions backend with one tracking graph per session"""
+    name = "mediapipe"
+    max_hands = 4
+
+    def __init__(self):
+        try:
+            # Try importing solutions explicitly for some versions
+            import mediapipe.python.solutions as mp_solutions
+        except (ImportError, AttributeError):
+            # Standard import fallback (raises if mediapipe is missing)
+            import mediapipe as mp
+            mp_solutions = mp.solutions
+        self.mp_hands = mp_solutions.hands
+        self.mp_face = mp_solutions.face_mesh
+        self.detectors = {}
+        self.lock = Lock()
+        self.available = True
+
+    def _get_detector(self, key, factory):
+        # MediaPipe graphs are not thread-safe; each one carries its own lock
+        with self.lock:
+            if key not in self.detectors:
+                self.detectors[key] = (factory(), Lock())
+            return self.detectors[key]
+
+    def detect_hands(self, rgb, session="default", max_hands=1):
+        detector, lock = self._get_detector(
+            ("hands", session, max_hands),
+            lambda: self.mp_hands.Hands(
+                max_num_hands=max_hands,
+                model_complexity=0,
+                min_detection_confidence=0.6,
+                min_tracking_confidence=0.6
+            )
+        )
+        with lock:
+            res = detector.process(rgb)
+        return list(res.multi_hand_landmarks or [])
+
+    def detect_faces(self, rgb, session="default", max_faces=1, refine=True):
+        detector, lock = self._get_detector(
+            ("faces", session, max_faces, refine),
+            lambda: self.mp_face.FaceMesh(
+                static_image_mode=False,
+                max_num_faces=max_faces,
+                refine_landmarks=refine,
+                min_detection_confidence=0.6,
+                min_tracking_confidence=0.6
+            )
+        )
+        with lock:
+            res = detector.process(rgb)
+        return list(res.multi_face_landmarks or [])
+
+class OnnxModel:
+    """
+    ONNX model on ONNX Runtime, or OpenCV DNN when onnxruntime is not
+    installed. The input layout (NHWC / NCHW), size and batch dimension
+    are read from the model itself; outputs come back in the graph's order.
+    """
+    def __init__(self, path, threads=ONNX_THREADS):
+        self.session = None
+        self.net = None
+        self.lock = Lock()
+        try:
+            import onnxruntime as ort
+        except ImportError:
+            ort = None
+
+        if ort is not None:
+            opts = ort.SessionOptions()
+            opts.intra_op_num_threads = threads
+            opts.inter_op_num_threads = 1
+            opts.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+            opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            self.session = ort.InferenceSession(path, opts, providers=["CPUExecutionProvider"])
+            inp = self.session.get_inputs()[0]
+            self.input_name = inp.name
+            shape = inp.shape
+            self.runtime = "onnxruntime"
+            if shape[0] == 1:
+                # tf2onnx keeps the tflite's fixed [1, ...] input, try to relax it
+                batched = self._batched_session(path, opts, ort)
+                if batched is not None:
+                    self.session = batched
+                    shape = [None] + list(shape[1:])
+        else:
+            # cv2.dnn can't report input shapes or the output order, read them from the graph
+            import onnx
+            graph = onnx.load(path, load_external_data=False).graph
+            shape = [dim.dim_value or None for dim in graph.input[0].type.tensor_type.shape.dim]
+            self.output_names = [out.name for out in graph.output]
+            # Shares OpenCV's global thread pool; ONNX_THREADS is not applied here
+            self.net = cv2.dnn.readNetFromONNX(path)
+            self.runtime = "opencv-dnn"
+
+        self.channels_first = shape[1] == 3
+        h, w = (shape[2], shape[3]) if self.channels_first else (shape[1], shape[2])
+        self.input_size = (int(w), int(h))
+        # Models with a fixed batch of 1 are fed one by one (and not batched)
+        self.dynamic_batch = shape[0] != 1
+        print(f"[AI] {path}: {self.runtime}, {'batched' if self.dynamic_batch else 'batch of 1'}")
+
+    def _batched_session(self, path, opts, ort):
+        """
+        Rewrite a fixed batch dimension of 1 to a symbolic one and keep the
+        result only if a two-item probe matches item-by-item runs (graphs
+        with hard-coded reshapes fail this). Needs the `onnx` package.
+        """
+        try:
+            import onnx
+        except ImportError:
+            return None
+        try:
+            model = onnx.load(path)
+            for value in list(model.graph.input) + list(model.graph.output):
+                dims = value.type.tensor_type.shape.dim
+                if len(dims) and dims[0].dim_value == 1:
+                    dims[0].dim_param = "batch"
+            session = ort.InferenceSession(model.SerializeToString(), opts,
+                                           providers=["CPUExecutionProvider"])
+            inp = self.session.get_inputs()[0]
+            probe = np.random.default_rng(0).random([2] + list(inp.shape[1:]), dtype=np.float32)
+            batched = session.run(None, {inp.name: probe})
+            singles = [self.session.run(None, {inp.name: probe[i:i + 1]}) for i in range(2)]
+            for j, out in enumerate(batched):
+                expected = np.concatenate([s[j] for s in singles])
+                if out.shape != expected.shape or not np.allclose(out, expected, atol=1e-4):
+                    return None
+            return session
+        except Exception as e:
+            print(f"[AI] {path}: can't batch ({e})")
+            return None
+
+    def to_tensor(self, rgb):
+        """Resize an RGB image to the model input and lay it out as the model expects"""
+        img = cv2.resize(rgb, self.input_size).astype(np.float32) / 255.0
+        return img.transpose(2, 0, 1) if self.channels_first else img
+
+    def _forward(self, batch):
+        if self.session is not None:
+            outputs = self.session.run(None, {self.input_name: batch})
+        else:
+            # The blob is passed in the model's own layout
+            self.net.setInput(batch)
+            outputs = self.net.forward(self.output_names)
+        return [np.asarray(o, dtype=np.float32).reshape(len(batch), -1) for o in outputs]
+
+    def run(self, tensors):
+        """Run on a list of input tensors; returns one (N, -1) array per model output"""
+        with self.lock:
+            if self.dynamic_batch:
+                return self._forward(np.stack(tensors))
+            results = [self._forward(t[None]) for t in tensors]
+        return [np.concatenate(out) for out in zip(*results)]
+
+class ModelBatcher:
+    """
+    Collects requests from concurrent pipelines (air, rps, several
+    cameras...) and fuses them into one model call.
+    """
+    def __init__(self, model, max_batch=ONNX_MAX_BATCH, window_ms=ONNX_BATCH_WINDOW_MS):
+        self.model = model
+        self.max_batch = max_batch
+        self.window = window_ms / 1000.0
+        self.requests = queue.Queue()
+        self.worker = Thread(target=self._run, daemon=True)
+        self.worker.start()
+
+    def submit_many(self, tensors):
+        """Run a list of input tensors; returns per-tensor lists of output rows"""
+        if not self.model.dynamic_batch:
+            # Nothing to fuse, don't pay the batching window
+            outputs = self.model.run(tensors)
+            return [[out[i] for out in outputs] for i in range(len(tensors))]
+        slots = [{"tensor": t, "done": threading.Event(), "result": None, "error": None}
+                 for t in tensors]
+        for slot in slots:
+            self.requests.put(slot)
+        for slot in slots:
+            slot["done"].wait()
+            if slot["error"] is not None:
+                raise slot["error"]
+        return [slot["result"] for slot in slots]
+
+    def _run(self):
+        while True:
+            pending = [self.requests.get()]
+            deadline = time.time() + self.window
+            while len(pending) < self.max_batch:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                try:
+                    pending.append(self.requests.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                outputs = self.model.run([s["tensor"] for s in pending])
+                for i, slot in enumerate(pending):
+                    slot["result"] = [out[i] for out in outputs]
+            except Exception as e:
+                for slot in pending:
+                    slot["error"] = e
+            for slot in pending:
+                slot["done"].set()
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-np.clip(x, -80, 80)))
+
+def _rotated_crop(rgb, cx, cy, size, angle, out_size):
+    """
+    Cut a square of `size` px centered on (cx, cy), rotated by `angle`, out of
+    the frame. Returns the crop and the 2x3 crop->frame affine matrix.
+    """
+    out_w, out_h = out_size
+    cos_a, sin_a = math.cos(angle), math.sin(angle)
+    kx, ky = size / out_w, size / out_h
+    to_frame = np.array([
+        [cos_a * kx, -sin_a * ky, cx - (cos_a * size - sin_a * size) / 2],
+        [sin_a * kx, cos_a * ky, cy - (sin_a * size + cos_a * size) / 2]
+    ], dtype=np.float32)
+    crop = cv2.warpAffine(rgb, to_frame, (out_w, out_h),
+                          flags=cv2.INTER_LINEAR | cv2.WARP_INVERSE_MAP,
+                          borderMode=cv2.BORDER_CONSTANT)
+    return crop, to_frame
+
+def _normalize_angle(angle):
+    return angle - 2 * math.pi * math.floor((angle + math.pi) / (2 * math.pi))
+
+def _ssd_anchors(input_w, input_h, strides=(8, 16, 16, 16)):
+    """Anchor centers for MediaPipe's palm detector (fixed size, 2 per layer and cell)"""
+    anchors = []
+    for stride in sorted(set(strides)):
+        per_cell = 2 * strides.count(stride)
+        rows, cols = math.ceil(input_h / stride), math.ceil(input_w / stride)
+        ys, xs = np.mgrid[0:rows, 0:cols]
+        centers = np.stack([(xs + 0.5) / cols, (ys + 0.5) / rows], axis=-1).reshape(-1, 2)
+        anchors.append(np.repeat(centers, per_cell, axis=0))
+    return np.concatenate(anchors).astype(np.float32)
+
+class OnnxBackend(InferenceBackend):
+    """
+    CPU backend for boxes without MediaPipe wheels, using the same two
+    stages as MediaPipe: a detector (palm detector for hands, YuNet via
+    cv2.FaceDetectorYN for faces) finds each hand / face, then the
+    landmark model runs on a rotated crop around it. Frames and crops
+    from concurrent sessions are batched into shared model calls when the
+    model accepts a batch dimension (see OnnxModel._batched_session).
+    """
+    name = "onnx"
+    max_hands = 4
+
+    def __init__(self, palm_model=ONNX_PALM_MODEL, hand_model=ONNX_HAND_MODEL,
+                 face_detector=ONNX_FACE_DETECTOR, face_model=ONNX_FACE_MODEL,
+                 threads=ONNX_THREADS):
+        self.palm = ModelBatcher(OnnxModel(palm_model, threads))
+        self.palm_anchors = _ssd_anchors(*self.palm.model.input_size)
+        self.hand = ModelBatcher(OnnxModel(hand_model, threads))
+        try:
+            self.face_detector = cv2.FaceDetectorYN.create(
+                face_detector, "", (FRAME_W, FRAME_H), ONNX_MIN_DETECTION, 0.3, 5000
+            )
+            self.face_detector_lock = Lock()
+            self.face = ModelBatcher(OnnxModel(face_model, threads))
+        except Exception as e:
+            print(f"[AI] ONNX face models unavailable: {e}")
+            self.face = None
+        self.available = True
+
+    # ---- Stage 1: detectors ------------------------------------------------
+    def _detect_palms(self, frames, max_hands):
+        """Returns, per frame, up to max_hands (cx, cy, size, angle) hand crops in px"""
+        tensors, letterbox = [], []
+        for rgb in frames:
+            h, w = rgb.shape[:2]
+            side = max(h, w)
+            pad_x, pad_y = (side - w) // 2, (side - h) // 2
+            square = cv2.copyMakeBorder(rgb, pad_y, side - h - pad_y, pad_x, side - w - pad_x,
+                                        cv2.BORDER_CONSTANT)
+            tensors.append(self.palm.model.to_tensor(square))
+            letterbox.append((side, pad_x, pad_y))
+
+        in_w, in_h = self.palm.model.input_size
+        results = []
+        for outputs, (side, pad_x, pad_y) in zip(self.palm.submit_many(tensors), letterbox):
+            # Regressors are 18 values per anchor (box + 7 keypoints), scores 1 logit
+            boxes = outputs[ONNX_PALM_OUTPUTS["boxes"]].reshape(-1, 18)
+            scores = _sigmoid(outputs[ONNX_PALM_OUTPUTS["scores"]].reshape(-1))
+            keep = np.flatnonzero(scores >= ONNX_MIN_DETECTION)
+            if not len(keep):
+                results.append([])
+                continue
+
+            anchors = self.palm_anchors[keep]
+            reg = boxes[keep]
+            scale = np.array([in_w, in_h], dtype=np.float32)
+            centers = (reg[:, 0:2] / scale + anchors) * side - (pad_x, pad_y)
+            sizes = reg[:, 2:4] / scale * side
+            kps = (reg[:, 4:18].reshape(-1, 7, 2) / scale + anchors[:, None]) * side - (pad_x, pad_y)
+
+            rects = [[float(c[0] - s[0] / 2), float(c[1] - s[1] / 2), float(s[0]), float(s[1])]
+                     for c, s in zip(centers, sizes)]
+            picked = cv2.dnn.NMSBoxes(rects, scores[keep].tolist(), ONNX_MIN_DETECTION, 0.3)
+            hands = []
+            for i in np.array(picked).reshape(-1)[:max_hands]:
+                wrist, middle = kps[i, 0], kps[i, 2]
+                # Rotate so the wrist -> middle finger axis points up
+                angle = _normalize_angle(
+                    math.pi / 2 - math.atan2(-(middle[1] - wrist[1]), middle[0] - wrist[0]))
+                size = float(max(sizes[i])) * 2.6
+                # Shift the crop towards the fingers (half a palm height)
+                shift = 0.5 * float(sizes[i][1])
+                cx = float(centers[i][0]) + shift * math.sin(angle)
+                cy = float(centers[i][1]) - shift * math.cos(angle)
+                hands.append((cx, cy, size, angle))
+            results.append(hands)
+        return results
+
+    def _detect_face_boxes(self, rgb, max_faces):
+        """Returns up to max_faces (cx, cy, size, angle) face crops in px"""
+        h, w = rgb.shape[:2]
+        with self.face_detector_lock:
+            self.face_detector.setInputSize((w, h))
+            _, found = self.face_detector.detect(cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR))
+        if found is None:
+            return []
+        faces = []
+        for f in sorted(found, key=lambda f: -f[14])[:max_faces]:
+            x, y, bw, bh = f[:4]
+            right_eye, left_eye = f[4:6], f[6:8]
+            # Level the eyes before running the mesh
+            angle = -math.atan2(-(left_eye[1] - right_eye[1]), left_eye[0] - right_eye[0])
+            faces.append((float(x + bw / 2), float(y + bh / 2), float(max(bw, bh)) * 1.5, angle))
+        return faces
+
+    # ---- Stage 2: landmarks on crops ----------------------------------------
+    def _landmarks(self, batcher, frames, crops_per_frame, num_points, spec):
+        tensors, jobs = [], []
+        for frame_i, (rgb, crops) in enumerate(zip(frames, crops_per_frame)):
+            for cx, cy, size, angle in crops:
+                crop, to_frame = _rotated_crop(rgb, cx, cy, size, angle, batcher.model.input_size)
+                tensors.append(batcher.model.to_tensor(crop))
+                jobs.append((frame_i, to_frame, rgb.shape[1], rgb.shape[0], size))
+
+        results = [[] for _ in frames]
+        if not tensors:
+            return results
+        for outputs, (frame_i, to_frame, w, h, size) in zip(batcher.submit_many(tensors), jobs):
+            coords = outputs[spec["landmarks"]][:num_points * 3].reshape(num_points, 3)
+            score = float(outputs[spec["score"]][0])
+            if spec["score_is_logit"]:
+                score = float(_sigmoid(score))
+            if score < ONNX_MIN_PRESENCE:
+                continue
+            # Crop px -> frame px -> normalized frame coordinates
+            xy = coords[:, :2] @ to_frame[:, :2].T + to_frame[:, 2]
+            arr = np.empty((num_points, 3), dtype=np.float32)
+            arr[:, 0] = xy[:, 0] / w
+            arr[:, 1] = xy[:, 1] / h
+            arr[:, 2] = coords[:, 2] * (size / batcher.model.input_size[0]) / w
+            results[frame_i].append(LandmarkList.from_array(arr))
+        return results
+
+    def detect_hands(self, rgb, session="default", max_hands=1):
+        return self.detect_hands_batch([rgb], session, max_hands)[0]
+
+    def detect_faces(self, rgb, session="default", max_faces=1, refine=True):
+        return self.detect_faces_batch([rgb], session, max_faces, refine)[0]
+
+    def detect_hands_batch(self, frames, session="default", max_hands=1):
+        return self._landmarks(self.hand, frames, self._detect_palms(frames, max_hands), 21,
+                               ONNX_HAND_OUTPUTS)
+
+    def detect_faces_batch(self, frames, session="default", max_faces=1, refine=True):
+        if self.face is None:
+            return [[] for _ in frames]
+        boxes = [self._detect_face_boxes(rgb, max_faces) for rgb in frames]
+        return self._landmarks(self.face, frames, boxes, 468, ONNX_FACE_OUTPUTS)
+
+def create_inference_backend(kind=INFERENCE_BACKEND):
+    """Build the configured backend, falling back down the list on failure"""
+    order = {
+        "mediapipe": [MediaPipeBackend],
+        "onnx": [OnnxBackend],
+        "auto": [MediaPipeBackend, OnnxBackend]
+    }.get(kind, [MediaPipeBackend, OnnxBackend])
+
+    for backend_cls in order:
+        try:
+            backend = backend_cls()
+            print(f"[OK] Inference backend: {backend.name}")
+            return backend
+        except Exception as e:
+            print(f"[AI] {backend_cls.name} backend unavailable: {e}")
+
+    print("!!! WARNING: No inference backend could be loaded. AI features will be disabled. !!!")
+    return InferenceBackend()
+
+inference = create_inference_backend()
+
+def draw_hand_landmarks(frame, hand_lms, line_color=(255, 255, 255), point_color=(248, 189, 56)):
+    h, w = frame.shape[:2]
+    pts = [(int(lm.x * w), int(lm.y * h)) for lm in hand_lms.landmark]
+    for a, b in HAND_CONNECTIONS:
+        cv2.line(frame, pts[a], pts[b], line_color, 1)
+    for p in pts:
+        cv2.circle(frame, p, 3, point_color, 2)
+
+def draw_backend_missing(frame):
+    cv2.putText(frame, "AI Backend Missing", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
 
 # ======================================================
 # CAMERA SETUP - Single shared camera for all games
 # ======================================================
-shared_camera = None
-camera_lock = Lock()
-
-def get_shared_camera():
-    """Initialize and return the shared camera instance with robust fallback"""
-    global shared_camera
-    if shared_camera is None or not shared_camera.isOpened():
-        # Try multiple backends and indices
-        backends = [
-            (cv2.CAP_DSHOW, "DirectShow"),
-            (cv2.CAP_MSMF, "Media Foundation"),
-            (cv2.CAP_ANY, "Auto")
-        ]
-        
-        for backend, name in backends:
-            print(f"Trying camera index 0 with {name}...")
-            temp_cam = cv2.VideoCapture(0, backend)
-            if temp_cam.isOpened():
-                ret, _ = temp_cam.read()
+CAMERA_INDICES = [0, 1]
+CAMERA_BACKENDS = [
+    (cv2.CAP_DSHOW, "DirectShow"),
+    (cv2.CAP_MSMF, "Media Foundation"),
+    (cv2.CAP_ANY, "Auto")
+]
+CAMERA_FPS = 30
+CAMERA_USE_MJPG = True          # Ask USB cameras for MJPG (cheaper than raw YUY2)
+CAMERA_RETRY_MIN_S = 0.5        # First reconnect delay
+CAMERA_RETRY_MAX_S = 10.0       # Backoff ceiling
+CAMERA_FULL_SWEEP_AFTER = 3     # Failed cached-only retries before probing every backend again
+CAMERA_STALE_S = 1.0            # Frames older than this are flagged as stale
+
+class CameraSupervisor:
+    """
+    Owns the shared camera. Remembers the last working index / backend /
+    settings, reconnects in its own thread with exponential backoff and
+    publishes frames to the game buffers. Streams never wait on it: they
+    keep serving the last frame and show the health banner instead.
+    """
+    def __init__(self, buffers, stop_event):
+        self.buffers = buffers
+        self.stop_event = stop_event
+        self.cap = None
+        self.last_good = None           # (index, backend_id, backend_name)
+        self.settings = {}
+        self.state = "CONNECTING"
+        self.retry_delay = CAMERA_RETRY_MIN_S
+        self.reconnects = 0
+        self.failed_attempts = 0
+        self.last_frame_time = 0.0
+        self.last_error = None
+        self.lock = Lock()
+
+    def _open(self, index, backend, name):
+        cap = cv2.VideoCapture(index, backend)
+        if not cap.isOpened():
+            print(f"  Failed to open camera {index} with {name}.")
+            return None
+
+        # FOURCC has to be requested before the frame size on DirectShow
+        if CAMERA_USE_MJPG:
+            cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*"MJPG"))
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, FRAME_W)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, FRAME_H)
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        cap.set(cv2.CAP_PROP_FPS, CAMERA_FPS)
+
+        ret, _ = cap.read()
+        if not ret:
+            print(f"  Camera {index} opened with {name} but failed to read frame.")
+            cap.release()
+            return None
+
+        fourcc = int(cap.get(cv2.CAP_PROP_FOURCC))
+        settings = {
+            "index": index,
+            "backend": name,
+            "fourcc": "".join(chr((fourcc >> (8 * i)) & 0xFF) for i in range(4)).strip("\x00") or "?",
+            "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            "fps": cap.get(cv2.CAP_PROP_FPS)
+        }
+        with self.lock:
+            self.settings = settings
+        print(f"[OK] Shared camera initialized using {name} (index {index}, {settings['fourcc']})")
+        return cap
+
+    def _candidates(self, full_sweep):
+        # Cached backend first, then (on a full sweep) the whole probe list
+        if self.last_good:
+            yield self.last_good
+            if not full_sweep:
+                return
+        for index in CAMERA_INDICES:
+            for backend, name in CAMERA_BACKENDS:
+                if (index, backend, name) != self.last_good:
+                    yield (index, backend, name)
+
+    def _connect(self):
+        # Only retry the cached backend at first (each probe can block for
+        # seconds), but sweep everything once it keeps failing, in case the
+        # camera came back on another index or only another backend works
+        full_sweep = (self.failed_attempts >= CAMERA_FULL_SWEEP_AFTER
+                      or self.retry_delay >= CAMERA_RETRY_MAX_S)
+        for index, backend, name in self._candidates(full_sweep):
+            if self.stop_event.is_set():
+                return None
+            print(f"Trying camera index {index} with {name}...")
+            cap = self._open(index, backend, name)
+            if cap is not None:
+                self.last_good = (index, backend, name)
+                self.failed_attempts = 0
+                return cap
+        self.failed_attempts += 1
+        if full_sweep:
+            print("!!! ALL CAMERA BACKENDS FAILED !!!")
+            self.failed_attempts = 0
+        return None
+
+    def _set_state(self, state, error=None):
+        with self.lock:
+            self.state = state
+            if error:
+                self.last_error = error
+
+    def run(self):
+        try:
+            while not self.stop_event.is_set():
+                if self.cap is None:
+                    self.cap = self._connect()
+                    if self.cap is None:
+                        self._set_state("RECONNECTING" if self.last_good else "CONNECTING")
+                        self.stop_event.wait(self.retry_delay)
+                        with self.lock:
+                            self.retry_delay = min(self.retry_delay * 2, CAMERA_RETRY_MAX_S)
+                        continue
+                    with self.lock:
+                        self.retry_delay = CAMERA_RETRY_MIN_S
+                    self._set_state("OK")
+
+                ret, frame = self.cap.read()
                 if ret:
-                    shared_camera = temp_cam
-                    shared_camera.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-                    shared_camera.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-                    shared_camera.set(cv2.CAP_PROP_BUFFERSIZE, 1)
-                    shared_camera.set(cv2.CAP_PROP_BUFFERSIZE, 1)
-                    shared_camera.set(cv2.CAP_PROP_FPS, 30)
-                    print(f"[OK] Shared camera initialized using {name}")
-                    return shared_camera
+                    frame_id = tracer.next_frame_id()
+                    tracer.instant("capture", "camera", frame_id)
+                    with self.lock:
+                        self.last_frame_time = time.time()
+                    for buf in self.buffers:
+                        buf.update(frame, frame_id)
                 else:
-                    print(f"  Camera opened with {name} but failed to read frame.")
-                    temp_cam.release()
-            else:
-                print(f"  Failed to open camera with {name}.")
-
-        print("!!! ALL CAMERA BACKENDS FAILED !!!")
-    return shared_camera
+                    print("Failed to read frame from camera. Reconnecting in background...")
+                    self.cap.release()
+                    self.cap = None
+                    with self.lock:
+                        self.reconnects += 1
+                    self._set_state("RECONNECTING", "read failed")
+        except Exception as e:
+            print(f"Error in camera supervisor: {e}")
+            self._set_state("FAILED", str(e))
+        finally:
+            if self.cap:
+                self.cap.release()
+                print("[OK] Camera released")
+
+    def health(self):
+        with self.lock:
+            age = time.time() - self.last_frame_time if self.last_frame_time else None
+            return {
+                "state": self.state,
+                "healthy": self.state == "OK" and age is not None and age < CAMERA_STALE_S,
+                "frame_age": round(age, 3) if age is not None else None,
+                "retry_delay": self.retry_delay,
+                "reconnects": self.reconnects,
+                "last_error": self.last_error,
+                "settings": dict(self.settings)
+            }
+
+    def is_healthy(self):
+        return self.health()["healthy"]
 
 # ======================================================
-# BACKGROUND FRAME READERS
+# BACKGROUND FRAME READER
 # ======================================================
-def unified_frame_reader():
-    """Single background thread that reads from one camera and updates all buffers"""
-    global shared_camera
-    shared_camera = get_shared_camera()
-    try:
-        while not stop_air_reader.is_set():  # Use air_reader as master stop flag
-            shared_camera = get_shared_camera() # Ensure camera is available
-            
-            if shared_camera is None:
-                print("Waiting for camera...")
-                time.sleep(2)
-                continue
-
-            with camera_lock:
-                ret, frame = shared_camera.read()
-            
-            if ret:
-                # Update all game buffers with the same frame
-                air_frame_buffer.update(frame)
-                face_frame_buffer.update(frame)
-                rps_frame_buffer.update(frame)
-            else:
-                print("Failed to read frame from camera. Re-initializing...")
-                shared_camera.release()
-                shared_camera = None
-                time.sleep(1)
-    except Exception as e:
-        print(f"Error in unified_frame_reader: {e}")
-    finally:
-        if shared_camera:
-            shared_camera.release()
-            print("[OK] Camera released")
+camera_supervisor = CameraSupervisor(
+    [air_frame_buffer, face_frame_buffer, rps_frame_buffer],
+    stop_air_reader  # Use air_reader as master stop flag
+)
+
+def draw_camera_status(frame):
+    """Overlay a banner while the camera is reconnecting / frames are stale"""
+    if camera_supervisor.is_healthy():
+        return
+    cv2.rectangle(frame, (0, frame.shape[0] - 36), (frame.shape[1], frame.shape[0]), (0, 0, 0), -1)
+    cv2.putText(frame, "CAMERA RECONNECTING...", (10, frame.shape[0] - 12),
+                cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 165, 255), 2)
 
 # Start unified background reader thread
-unified_reader_thread = Thread(target=unified_frame_reader, daemon=True)
+unified_reader_thread = Thread(target=camera_supervisor.run, daemon=True)
 unified_reader_thread.start()
 print("[OK] Unified frame reader thread started")
 
@@ -318,10 +1104,10 @@ def classify_shape(points):
     - ZIGZAG: Multiple sharp turns
     - ARC: Low linearity (curved) but open (not closed) + Smooth turns
     """
-    if len(points) < 30:
+    if len(points) < 3:
         return None, 0.0
 
-    pts = np.array(points, dtype=np.float32)
+    pts = np.asarray(points, dtype=np.float32)
     
     # 1. Linearity Check
     # Calculate total path length (sum of distances between consecutive points)
@@ -331,7 +1117,7 @@ def classify_shape(points):
     # Distance between start and end point
     start_end_dist = np.linalg.norm(pts[0] - pts[-1])
     
-    if path_len < 10: return None, 0.0 # Too small movement
+    if path_len < AIR_MIN_SHAPE_PX: return None, 0.0 # Too small movement
     
     linearity = start_end_dist / path_len  # 1.0 = Straight Line, ~0.0 = Closed Loop
     
@@ -393,42 +1179,376 @@ def classify_shape(points):
     # Arc is a smooth curve (low sharp turns, moderate total angle change)
     return "ARC", 0.85
 
-def index_only_up(lm):
-    tips = [8, 12, 16, 20]
-    pips = [6, 10, 14, 18]
-    states = [lm[t].y < lm[p].y for t, p in zip(tips, pips)]
-    return states[0] and not any(states[1:])
-
-def calculate_distance(p1, p2):
-    return math.hypot(p1.x - p2.x, p1.y - p2.y)
-
-def analyze_rps_gesture(landmarks):
-    wrist = landmarks[0]
-    tips = [8, 12, 16, 20]
-    knuckles = [6, 10, 14, 18]
-    open_fingers = []
-    for i in range(4):
-        dist_tip = calculate_distance(landmarks[tips[i]], wrist)
-        dist_knuckle = calculate_distance(landmarks[knuckles[i]], wrist)
-        open_fingers.append(dist_tip > dist_knuckle)
-
-    thumb_dist = calculate_distance(landmarks[4], landmarks[17])
-    thumb_joint_dist = calculate_distance(landmarks[3], landmarks[17])
-    thumb_open = thumb_dist > thumb_joint_dist
-
-    if all(open_fingers) and thumb_open:
-        return "Paper"
-    if open_fingers[0] and open_fingers[1] and not open_fingers[2] and not open_fingers[3]:
-        return "Scissors"
-    if not any(open_fingers):
-        return "Rock"
-    return "Unknown"
+# Landmark indices of finger tips / PIP knuckles (index, middle, ring, pinky)
+FINGER_TIPS = np.array([8, 12, 16, 20])
+FINGER_PIPS = np.array([6, 10, 14, 18])
+
+def landmarks_to_array(hands):
+    """Convert detector output once per frame into a (hands, points, 3) float32 array"""
+    if not hands:
+        return np.empty((0, 21, 3), dtype=np.float32)
+    return np.stack([
+        h.array if getattr(h, "array", None) is not None
+        else np.array([(lm.x, lm.y, lm.z) for lm in h.landmark], dtype=np.float32)
+        for h in hands
+    ])
+
+def index_only_up(lms):
+    """(hands,) bool: index finger raised, the other three folded"""
+    up = lms[:, FINGER_TIPS, 1] < lms[:, FINGER_PIPS, 1]
+    return up[:, 0] & ~up[:, 1:].any(axis=1)
+
+def finger_states(lms):
+    """
+    Finger-state features for all hands in one pass.
+    Returns (open_fingers (hands, 4), thumb_open (hands,)).
+    """
+    xy = lms[..., :2]
+    wrist = xy[:, :1]
+    tip_dist = np.linalg.norm(xy[:, FINGER_TIPS] - wrist, axis=-1)
+    pip_dist = np.linalg.norm(xy[:, FINGER_PIPS] - wrist, axis=-1)
+    thumb_dist = np.linalg.norm(xy[:, 4] - xy[:, 17], axis=-1)
+    thumb_joint_dist = np.linalg.norm(xy[:, 3] - xy[:, 17], axis=-1)
+    return tip_dist > pip_dist, thumb_dist > thumb_joint_dist
+
+def analyze_rps_gestures(lms):
+    """Label every hand in a (hands, 21, 3) array as Rock / Paper / Scissors / Unknown"""
+    open_fingers, thumb_open = finger_states(lms)
+    paper = open_fingers.all(axis=1) & thumb_open
+    scissors = open_fingers[:, 0] & open_fingers[:, 1] & ~open_fingers[:, 2] & ~open_fingers[:, 3]
+    rock = ~open_fingers.any(axis=1)
+    labels = np.select([paper, scissors, rock], ["Paper", "Scissors", "Rock"], default="Unknown")
+    return labels.tolist()
+
+class GestureVoter:
+    """Majority vote over the last few per-frame labels"""
+    def __init__(self, size=RPS_VOTE_FRAMES):
+        self.labels = deque(maxlen=size)
+
+    def push(self, label):
+        self.labels.append(label if label in RPS_MOVES else None)
+
+    def result(self):
+        """Return (move, confidence); move is None until the window is full"""
+        counts = {}
+        for label in self.labels:
+            if label:
+                counts[label] = counts.get(label, 0) + 1
+        if not counts:
+            return None, 0.0
+        move = max(counts, key=counts.get)
+        conf = counts[move] / self.labels.maxlen
+        if len(self.labels) < self.labels.maxlen:
+            return None, conf
+        return move, conf
+
+    def reset(self):
+        self.labels.clear()
+
+if RPS_PLAYERS not in (1, 2) or (inference.available and RPS_PLAYERS > inference.max_hands):
+    # Otherwise the game would wait in DETECTING forever for hands it can't see
+    print(f"!!! WARNING: RPS_PLAYERS = {RPS_PLAYERS} is not supported with the "
+          f"{inference.name} backend. Falling back to 1 player. !!!")
+    RPS_PLAYERS = 1
+
+rps_voters = [GestureVoter() for _ in range(RPS_PLAYERS)]
 
 def resolve_rps_winner(p, c):
     if p == c: return "Tie"
     beats = {"Rock": "Scissors", "Paper": "Rock", "Scissors": "Paper"}
     return "Player" if beats[p] == c else "Computer"
 
+# ======================================================
+# FACE TRACKING (ROI + adaptive input resolution)
+# ======================================================
+class FaceTracker:
+    """
+    Runs the face mesh on a crop around the last known face (with
+    refinement) and only searches the full frame when the face is lost.
+    Both paths are timed against the frame budget: the full-frame input
+    width adapts, and the crop shrinks, then drops refinement, when the
+    tracked path runs over. Returns landmark arrays in full-frame
+    normalized coordinates.
+    """
+    def __init__(self, session="face"):
+        self.session = session
+        self.box = None                 # Last face box in pixels (x0, y0, x1, y1)
+        self.input_w = FACE_MAX_INPUT_W
+        self.roi_input_w = FACE_ROI_INPUT_W
+        self.refine = FACE_REFINE
+        self.detect_time = {}           # EMA of detector seconds per frame, per regime
+        self.streak = {}                # Consecutive over (+) / under (-) budget frames, per path
+        self.warm_graphs = set()        # Graphs that already ran once (first call builds them)
+
+    def _budget_check(self, path, regime, elapsed):
+        """
+        Update the regime's timing EMA. Returns 1 / -1 only once the path has
+        been over / well under budget for FACE_ADAPT_FRAMES frames in a row.
+        """
+        ema = self.detect_time.get(regime)
+        ema = elapsed if ema is None else 0.8 * ema + 0.2 * elapsed
+        self.detect_time[regime] = ema
+        budget = FACE_DETECT_SHARE / FACE_TARGET_FPS
+        state = 1 if ema > budget else (-1 if ema < budget * 0.5 else 0)
+
+        streak = self.streak.get(path, 0)
+        if state == 0 or (streak and (streak > 0) != (state > 0)):
+            streak = 0
+        streak += state
+        if abs(streak) >= FACE_ADAPT_FRAMES:
+            self.streak[path] = 0
+            return state
+        self.streak[path] = streak
+        return 0
+
+    def _adapt_full(self, elapsed):
+        check = self._budget_check("full", ("full", self.input_w), elapsed)
+        if check > 0:
+            self.input_w = max(FACE_MIN_INPUT_W, int(self.input_w * 0.85) // 32 * 32)
+        elif check < 0:
+            self.input_w = min(FACE_MAX_INPUT_W, (int(self.input_w * 1.1) + 31) // 32 * 32)
+
+    def _adapt_roi(self, elapsed):
+        check = self._budget_check("roi", ("roi", self.refine), elapsed)
+        if check > 0:
+            if self.roi_input_w > FACE_MIN_ROI_INPUT_W:
+                self.roi_input_w = max(FACE_MIN_ROI_INPUT_W, int(self.roi_input_w * 0.85) // 32 * 32)
+            elif self.refine:
+                print("[FACE] Over frame budget, disabling landmark refinement")
+                self.refine = False
+        elif check < 0:
+            # The refined timing is kept across toggles: only switch back if it fits the budget
+            refined_time = self.detect_time.get(("roi", True))
+            budget = FACE_DETECT_SHARE / FACE_TARGET_FPS
+            if FACE_REFINE and not self.refine and (refined_time is None or refined_time <= budget):
+                print("[FACE] Back under frame budget, enabling landmark refinement")
+                self.refine = True
+            elif self.roi_input_w < FACE_ROI_INPUT_W:
+                self.roi_input_w = min(FACE_ROI_INPUT_W, (int(self.roi_input_w * 1.1) + 31) // 32 * 32)
+
+    def _set_box(self, face, w, h):
+        xy = face[:, :2] * (w, h)
+        x0, y0 = xy.min(axis=0)
+        x1, y1 = xy.max(axis=0)
+        mx, my = (x1 - x0) * FACE_ROI_MARGIN, (y1 - y0) * FACE_ROI_MARGIN
+        self.box = (max(0, int(x0 - mx)), max(0, int(y0 - my)),
+                    min(w, int(x1 + mx)), min(h, int(y1 + my)))
+
+    def _detect(self, bgr, max_w, session, max_faces, refine, adapt, trace):
+        bh, bw = bgr.shape[:2]
+        if bw > max_w:
+            bgr = cv2.resize(bgr, (max_w, int(bh * max_w / bw)), interpolation=cv2.INTER_AREA)
+        rgb = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
+        trace.mark("preprocess")
+        start = time.perf_counter()
+        faces = inference.detect_faces(rgb, session=session, max_faces=max_faces, refine=refine)
+        trace.mark("detect")
+        graph = (session, max_faces, refine)
+        if graph in self.warm_graphs:
+            adapt(time.perf_counter() - start)
+        else:
+            # The first call builds the graph, don't count it against the budget
+            self.warm_graphs.add(graph)
+        return landmarks_to_array(faces)
+
+    def process(self, frame, trace=_NULL_FRAME_TRACE):
+        """Marks "preprocess" / "detect" on `trace` for each detector run (ROI, then full frame if lost)"""
+        h, w = frame.shape[:2]
+        if self.box is not None:
+            x0, y0, x1, y1 = self.box
+            if x1 - x0 > 16 and y1 - y0 > 16:
+                faces = self._detect(frame[y0:y1, x0:x1], self.roi_input_w,
+                                     self.session + "_roi", 1, self.refine, self._adapt_roi, trace)
+                if len(faces):
+                    # Crop-normalized -> full-frame normalized
+                    faces[..., 0] = (x0 + faces[..., 0] * (x1 - x0)) / w
+                    faces[..., 1] = (y0 + faces[..., 1] * (y1 - y0)) / h
+                    faces[..., 2] *= (x1 - x0) / w
+                    self._set_box(faces[0], w, h)
+                    return faces
+            self.box = None
+
+        faces = self._detect(frame, self.input_w, self.session, FACE_MAX_FACES, False,
+                             self._adapt_full, trace)
+        if len(faces):
+            self._set_box(faces[0], w, h)
+        return faces
+
+    def reset(self):
+        self.box = None
+
+face_tracker = FaceTracker()
+
+def draw_face_points(frame, face, color=(0, 215, 255)):
+    """Paint all mesh points at once instead of one cv2.circle call each"""
+    h, w = frame.shape[:2]
+    xs = (face[:, 0] * w).astype(int)
+    ys = (face[:, 1] * h).astype(int)
+    # Drop landmarks outside the frame instead of piling them on the border
+    inside = (xs >= 1) & (xs <= w - 2) & (ys >= 1) & (ys <= h - 2)
+    xs, ys = xs[inside], ys[inside]
+    for dx, dy in ((0, 0), (1, 0), (-1, 0), (0, 1), (0, -1)):
+        frame[ys + dy, xs + dx] = color
+
+# ======================================================
+# STREAM BROADCAST (one pipeline per game, many viewers)
+# ======================================================
+STREAM_RESTART_DELAY_S = 1.0  # Pause before restarting a crashed game pipeline
+
+class StreamHub:
+    """
+    Runs a game's frame generator once, in its own thread, while anyone is
+    watching and fans the encoded chunks out to every viewer. Sync viewers
+    (threaded servers) block on a Condition; async viewers (ASGI) await an
+    asyncio.Event, so no thread is tied up per client.
+    """
+    def __init__(self, name, gen_factory):
+        self.name = name
+        self.gen_factory = gen_factory
+        self.chunk = None
+        self.seq = 0
+        self.subscribers = 0
+        self.running = False
+        self.lock = Lock()
+        self.new_chunk = threading.Condition(self.lock)
+        self.async_waiters = set()
+
+    def subscribe(self):
+        """Register a viewer; returns the current seq so it only gets fresh chunks"""
+        with self.lock:
+            self.subscribers += 1
+            if not self.running:
+                self.running = True
+                Thread(target=self._produce, name=f"{self.name}-stream", daemon=True).start()
+            return self.seq
+
+    def unsubscribe(self):
+        with self.lock:
+            self.subscribers -= 1
+
+    def _produce(self):
+        while True:
+            gen = self.gen_factory()
+            try:
+                for chunk in gen:
+                    with self.lock:
+                        self.chunk = chunk
+                        self.seq += 1
+                        self.new_chunk.notify_all()
+                        waiters, self.async_waiters = self.async_waiters, set()
+                        idle = self.subscribers <= 0
+                        if idle:
+                            self.running = False
+                    for loop, event in waiters:
+                        loop.call_soon_threadsafe(event.set)
+                    if idle:
+                        return
+            except Exception as e:
+                print(f"Error in {self.name} stream: {e}")
+            finally:
+                gen.close()
+
+            # The pipeline died: restart it while anyone is still watching
+            with self.lock:
+                if self.subscribers <= 0:
+                    self.running = False
+                    return
+            print(f"Restarting {self.name} stream...")
+            time.sleep(STREAM_RESTART_DELAY_S)
+
+    def wait(self, seq, timeout=1.0):
+        """Block until a chunk newer than `seq`; returns (chunk, seq)"""
+        with self.lock:
+            if self.seq == seq:
+                self.new_chunk.wait(timeout)
+            return self.chunk, self.seq
+
+    async def wait_async(self, seq, timeout=1.0, stop=None):
+        """Await a chunk newer than `seq` (or `stop` being set); returns (chunk, seq)"""
+        event = asyncio.Event()
+        waiter = (asyncio.get_running_loop(), event)
+        with self.lock:
+            if self.seq != seq:
+                return self.chunk, self.seq
+            self.async_waiters.add(waiter)
+        waits = [asyncio.ensure_future(event.wait())]
+        if stop is not None:
+            waits.append(asyncio.ensure_future(stop.wait()))
+        try:
+            await asyncio.wait(waits, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for w in waits:
+                w.cancel()
+            with self.lock:
+                self.async_waiters.discard(waiter)
+        with self.lock:
+            return self.chunk, self.seq
+
+    def stream(self):
+        """Sync MJPEG iterator for WSGI responses"""
+        seq = self.subscribe()
+        try:
+            while True:
+                chunk, new_seq = self.wait(seq)
+                if new_seq != seq and chunk is not None:
+                    seq = new_seq
+                    yield chunk
+        finally:
+            self.unsubscribe()
+
+    async def astream(self, stop=None):
+        """Async MJPEG iterator for the ASGI server; ends once `stop` is set"""
+        seq = self.subscribe()
+        try:
+            while stop is None or not stop.is_set():
+                chunk, new_seq = await self.wait_async(seq, stop=stop)
+                if new_seq != seq and chunk is not None:
+                    seq = new_seq
+                    yield chunk
+        finally:
+            self.unsubscribe()
+
+# ======================================================
+# RESPONSE CACHING & COMPRESSION
+# ======================================================
+GZIP_MIN_SIZE = 512
+GZIP_MIMETYPES = ("text/html", "application/json")
+_gzip_cache = {}              # ETag -> compressed page body
+
+@app.after_request
+def cache_and_compress(response):
+    if response.direct_passthrough or response.is_streamed or response.status_code != 200:
+        return response
+
+    if response.mimetype in GZIP_MIMETYPES:
+        # The body depends on Accept-Encoding whether or not this client gets gzip
+        response.vary.add("Accept-Encoding")
+
+    if response.mimetype == "text/html":
+        # Revalidate instead of caching blindly: "/" also resets the robot face
+        response.headers["Cache-Control"] = "no-cache"
+        response.add_etag(weak=True)
+        response.make_conditional(request)
+        if response.status_code != 200:
+            return response
+    elif response.mimetype == "application/json":
+        response.headers.setdefault("Cache-Control", "no-store")
+
+    if (response.mimetype in GZIP_MIMETYPES
+            and "gzip" in request.headers.get("Accept-Encoding", "")
+            and "Content-Encoding" not in response.headers):
+        body = response.get_data()
+        if len(body) >= GZIP_MIN_SIZE:
+            etag = response.headers.get("ETag")
+            compressed = _gzip_cache.get(etag) if etag else None
+            if compressed is None:
+                compressed = gzip.compress(body, compresslevel=6)
+                if etag and len(_gzip_cache) < 32:
+                    _gzip_cache[etag] = compressed
+            response.set_data(compressed)
+            response.headers["Content-Encoding"] = "gzip"
+    return response
+
 # ======================================================
 # MAIN INDEX
 # ======================================================
@@ -438,6 +1558,30 @@ def index():
     robot.send_face("NEUTRAL") 
     return render_template('index.html')
 
+@app.route("/camera/health")
+def camera_health():
+    return jsonify(camera_supervisor.health())
+
+# ======================================================
+# TRACE ROUTES
+# ======================================================
+@app.route("/debug/trace")
+def debug_trace():
+    """Download the frame trace; open it in chrome://tracing or ui.perfetto.dev"""
+    response = jsonify(tracer.chrome_trace())
+    response.headers["Content-Disposition"] = "attachment; filename=robot_trace.json"
+    return response
+
+@app.route("/debug/trace/start", methods=['POST'])
+def debug_trace_start():
+    tracer.start()
+    return jsonify(success=True)
+
+@app.route("/debug/trace/stop", methods=['POST'])
+def debug_trace_stop():
+    tracer.stop()
+    return jsonify(success=True)
+
 # ======================================================
 # AIR DRAWING ROUTES
 # ======================================================
@@ -446,41 +1590,48 @@ def air_index():
     return render_template('air.html')
 
 def air_gen_frames():
-    global air_points, air_drawing_active, air_hand_present, air_last_hand_present, air_final_result, air_final_conf
+    global air_drawing_active, air_hand_present, air_last_hand_present, air_final_result, air_final_conf
+
+    frame_id = None
 
     while True:
-        frame = air_frame_buffer.get()
+        # Wait before starting the trace so camera idle time isn't counted as handoff
+        air_frame_buffer.wait_new(frame_id)
+        trace = tracer.frame("air")
+        frame, frame_id = air_frame_buffer.get_tagged()
         if frame is None:
-            time.sleep(0.01)
             continue
+        trace.mark("handoff", frame_id)
 
         frame = cv2.flip(frame, 1)
         small = cv2.resize(frame, (PROCESS_W, PROCESS_H))
         
-        if MEDIAPIPE_AVAILABLE:
+        if inference.available:
             rgb = cv2.cvtColor(small, cv2.COLOR_BGR2RGB)
-            res = hand_detector.process(rgb)
+            trace.mark("preprocess")
+            hands = inference.detect_hands(rgb, session="air")
+            trace.mark("detect")
         else:
-            res = type('obj', (object,), {'multi_hand_landmarks': None})
-            cv2.putText(frame, "MediaPipe Missing", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
+            hands = []
+            draw_backend_missing(frame)
 
         air_last_hand_present = air_hand_present
         air_hand_present = False
 
-        if res.multi_hand_landmarks:
+        if hands:
             air_hand_present = True
-            lm = res.multi_hand_landmarks[0].landmark
+            lm = hands[0].landmark
 
-            if index_only_up(lm):
+            if index_only_up(landmarks_to_array(hands[:1]))[0]:
                 air_drawing_active = True
                 x = int(lm[8].x * FRAME_W)
                 y = int(lm[8].y * FRAME_H)
-                air_points.append((x, y))
+                air_points.add(x, y)
             else:
                 air_drawing_active = False
 
         if air_last_hand_present and not air_hand_present:
-            shape, conf = classify_shape(air_points)
+            shape, conf = classify_shape(air_points.points())
             if shape:
                 with game_locks['air']:
                     air_final_result = EPIC_MAP[shape]
@@ -492,21 +1643,27 @@ def air_gen_frames():
             else:
                  # TRIGGER WRONG IF DRAWING WAS ATTEMPTED BUT FAILED?
                  # For now, maybe just "WRONG" if points were > 10 but no shape?
-                 if len(air_points) > 20: 
+                 if air_points.length() > AIR_MIN_ATTEMPT_PX: 
                      robot.send_face("WRONG")
 
             air_points.clear()
             air_drawing_active = False
 
-        for i in range(1, len(air_points)):
-            cv2.line(frame, air_points[i - 1], air_points[i], (0, 215, 255), 2)
+        if len(air_points) > 1:
+            cv2.polylines(frame, [air_points.int_points()], False, (0, 215, 255), 2)
 
+        draw_camera_status(frame)
+        trace.mark("draw")
         _, jpg = cv2.imencode('.jpg', frame)
+        trace.mark("encode")
         yield (b'--frame\r\nContent-Type: image/jpeg\r\n\r\n' + jpg.tobytes() + b'\r\n')
+        trace.mark("yield")
+
+air_stream = StreamHub("air", air_gen_frames)
 
 @app.route("/air/video")
 def air_video():
-    return Response(air_gen_frames(), mimetype='multipart/x-mixed-replace; boundary=frame')
+    return Response(air_stream.stream(), mimetype='multipart/x-mixed-replace; boundary=frame')
 
 @app.route("/air/result")
 def air_result():
@@ -532,34 +1689,29 @@ def face_gen_frames():
     global face_present, face_fps
     prev = time.time()
 
+    frame_id = None
+
     while True:
-        frame = face_frame_buffer.get()
+        # Wait before starting the trace so camera idle time isn't counted as handoff
+        face_frame_buffer.wait_new(frame_id)
+        trace = tracer.frame("face")
+        frame, frame_id = face_frame_buffer.get_tagged()
         if frame is None:
-            time.sleep(0.01)
             continue
+        trace.mark("handoff", frame_id)
 
-        h, w, _ = frame.shape
-        if MEDIAPIPE_AVAILABLE:
-            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            res = face_mesh_detector.process(rgb)
+        if inference.available:
+            # Crop / resize / colour conversion happen inside the tracker, which marks the stages
+            faces = face_tracker.process(frame, trace)
         else:
-             res = type('obj', (object,), {'multi_face_landmarks': None})
-             cv2.putText(frame, "MediaPipe Missing", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
+            faces = []
+            draw_backend_missing(frame)
 
         face_present = False
 
-        if res.multi_face_landmarks:
+        if len(faces):
             face_present = True
-            face = res.multi_face_landmarks[0]
-
-            for lm in face.landmark:
-                cv2.circle(
-                    frame,
-                    (int(lm.x * w), int(lm.y * h)),
-                    1,
-                    (0, 215, 255),
-                    -1
-                )
+            draw_face_points(frame, faces[0])
         
         # ROBOT FACE LOGIC
         # We need a static variable to track state changes to avoid spamming serial
@@ -585,17 +1737,23 @@ def face_gen_frames():
             1, (255, 215, 0), 2
         )
 
+        draw_camera_status(frame)
+        trace.mark("draw")
         _, buffer = cv2.imencode(".jpg", frame)
+        trace.mark("encode")
         yield (
             b"--frame\r\n"
             b"Content-Type: image/jpeg\r\n\r\n" +
             buffer.tobytes() +
             b"\r\n"
         )
+        trace.mark("yield")
+
+face_stream = StreamHub("face", face_gen_frames)
 
 @app.route("/face/video")
 def face_video():
-    return Response(face_gen_frames(), mimetype="multipart/x-mixed-replace; boundary=frame")
+    return Response(face_stream.stream(), mimetype="multipart/x-mixed-replace; boundary=frame")
 
 @app.route("/face/find")
 def face_find():
@@ -621,77 +1779,119 @@ def rps_index():
     return render_template('rps.html')
 
 
+def rps_player_slot(wrist_x):
+    """Which player a hand belongs to (mirrored frame: left half is player 1)"""
+    if RPS_PLAYERS == 1:
+        return 0
+    return min(int(wrist_x * RPS_PLAYERS), RPS_PLAYERS - 1)
+
+def rps_decide(moves, confs):
+    """Lock in the voted moves and trigger the robot reaction (call with the rps lock held)"""
+    global rps_state, rps_player_move, rps_computer_move, rps_winner, rps_confidence
+    rps_player_move = moves[0]
+    if RPS_PLAYERS == 1:
+        rps_computer_move = random.choice(RPS_MOVES)
+    else:
+        rps_computer_move = moves[1]
+    rps_winner = resolve_rps_winner(rps_player_move, rps_computer_move)
+    rps_confidence = min(confs)
+    rps_state = GameState.RESULT
+
+    # ROBOT EMOTION
+    if RPS_PLAYERS > 1:
+        robot.send_face("NEUTRAL" if rps_winner == "Tie" else "CORRECT")
+    elif rps_winner == "Computer":
+        robot.send_face("LOVING") # Gloat
+    elif rps_winner == "Player":
+        robot.send_face("SAD") # Sore loser
+    else:
+        robot.send_face("NEUTRAL")
+
 def rps_gen_frames():
-    global rps_state, rps_countdown_start, rps_player_move, rps_computer_move, rps_winner
+    global rps_state
+
+    frame_id = None
+    voted_frame_id = None
 
     while True:
-        frame = rps_frame_buffer.get()
+        # Wait before starting the trace so camera idle time isn't counted as handoff
+        rps_frame_buffer.wait_new(frame_id)
+        trace = tracer.frame("rps")
+        frame, frame_id = rps_frame_buffer.get_tagged()
         if frame is None:
-            time.sleep(0.01)
             continue
+        trace.mark("handoff", frame_id)
 
         frame = cv2.flip(frame, 1)
         h, w, _ = frame.shape
         
-        if MEDIAPIPE_AVAILABLE:
+        if inference.available:
             rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            results = hand_detector.process(rgb)
+            trace.mark("preprocess")
+            hands = inference.detect_hands(rgb, session="rps", max_hands=RPS_PLAYERS)
+            trace.mark("detect")
         else:
-            results = type('obj', (object,), {'multi_hand_landmarks': None})
-            cv2.putText(frame, "MediaPipe Missing", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
+            hands = []
+            draw_backend_missing(frame)
 
-        detected_label = "Scanning..."
+        # One array per frame, features for every hand in a single pass
+        lms = landmarks_to_array(hands)
+        labels = analyze_rps_gestures(lms)
+        frame_labels = [None] * RPS_PLAYERS
 
-        if results.multi_hand_landmarks:
-            for hand_lms in results.multi_hand_landmarks:
-                detected_label = analyze_rps_gesture(hand_lms.landmark)
-                coords_x = [int(lm.x * w) for lm in hand_lms.landmark]
-                coords_y = [int(lm.y * h) for lm in hand_lms.landmark]
-                x_min, x_max = max(0, min(coords_x) - 30), min(w, max(coords_x) + 30)
-                y_min, y_max = max(0, min(coords_y) - 30), min(h, max(coords_y) + 30)
+        if hands:
+            boxes_min = (lms[:, :, :2].min(axis=1) * (w, h)).astype(int) - 30
+            boxes_max = (lms[:, :, :2].max(axis=1) * (w, h)).astype(int) + 30
+            accent_color = (248, 189, 56)
+
+            for i, hand_lms in enumerate(hands):
+                detected_label = labels[i]
+                frame_labels[rps_player_slot(lms[i, 0, 0])] = detected_label
+                x_min, y_min = max(0, boxes_min[i][0]), max(0, boxes_min[i][1])
+                x_max, y_max = min(w, boxes_max[i][0]), min(h, boxes_max[i][1])
 
-                accent_color = (248, 189, 56)
                 cv2.rectangle(frame, (x_min, y_min), (x_max, y_max), accent_color, 2)
                 cv2.rectangle(frame, (x_min, y_min - 35), (x_min + 110, y_min), accent_color, -1)
                 cv2.putText(frame, detected_label, (x_min + 5, y_min - 10),
                             cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 0), 2)
 
-                mp_draw.draw_landmarks(frame, hand_lms, mp_hands.HAND_CONNECTIONS,
-                                            mp_draw.DrawingSpec(color=(255, 255, 255), thickness=1),
-                                            mp_draw.DrawingSpec(color=accent_color, thickness=2))
-
-                with game_locks['rps']:
-                    if rps_state == GameState.DETECTING:
-                        if detected_label in ["Rock", "Paper", "Scissors"]:
-                            rps_player_move = detected_label
-                            rps_computer_move = random.choice(["Rock", "Paper", "Scissors"])
-                            rps_winner = resolve_rps_winner(rps_player_move, rps_computer_move)
-                            rps_state = GameState.RESULT
-                            
-                            # ROBOT EMOTION
-                            if rps_winner == "Computer":
-                                robot.send_face("LOVING") # Gloat
-                            elif rps_winner == "Player":
-                                robot.send_face("SAD") # Sore loser
-                            else:
-                                robot.send_face("NEUTRAL")
+                draw_hand_landmarks(frame, hand_lms, point_color=accent_color)
 
         with game_locks['rps']:
+            # Vote over the last few frames so a mid-transition frame can't decide the game.
+            # Only fresh camera frames vote: a stale frame re-served during a reconnect
+            # must not fill the window on its own.
+            if rps_state == GameState.DETECTING and frame_id != voted_frame_id:
+                voted_frame_id = frame_id
+                for voter, label in zip(rps_voters, frame_labels):
+                    voter.push(label)
+                votes = [voter.result() for voter in rps_voters]
+                if all(move and conf >= RPS_VOTE_MIN_CONF for move, conf in votes):
+                    rps_decide([move for move, _ in votes], [conf for _, conf in votes])
+
             if rps_state == GameState.COUNTDOWN:
                 elapsed = time.time() - rps_countdown_start
                 cd_val = 3 - int(elapsed)
                 if cd_val <= 0:
                     rps_state = GameState.DETECTING
+                    for voter in rps_voters:
+                        voter.reset()
                 else:
                     cv2.putText(frame, str(cd_val), (int(w / 2) - 40, int(h / 2) + 40),
                                 cv2.FONT_HERSHEY_DUPLEX, 4, (56, 189, 248), 8)
 
+        draw_camera_status(frame)
+        trace.mark("draw")
         _, buffer = cv2.imencode('.jpg', frame)
+        trace.mark("encode")
         yield (b'--frame\r\nContent-Type: image/jpeg\r\n\r\n' + buffer.tobytes() + b'\r\n')
+        trace.mark("yield")
+
+rps_stream = StreamHub("rps", rps_gen_frames)
 
 @app.route('/rps/video_feed')
 def rps_video_feed():
-    return Response(rps_gen_frames(), mimetype='multipart/x-mixed-replace; boundary=frame')
+    return Response(rps_stream.stream(), mimetype='multipart/x-mixed-replace; boundary=frame')
 
 @app.route('/rps/start', methods=['POST'])
 def rps_start_game():
@@ -703,10 +1903,11 @@ def rps_start_game():
 
 @app.route('/rps/reset', methods=['POST'])
 def rps_reset_game():
-    global rps_state, rps_player_move, rps_computer_move, rps_winner
+    global rps_state, rps_player_move, rps_computer_move, rps_winner, rps_confidence
     with game_locks['rps']:
         rps_state = GameState.IDLE
         rps_player_move = rps_computer_move = rps_winner = None
+        rps_confidence = 0.0
         
         # Reset robot face
         robot.send_face("NEUTRAL")
@@ -720,14 +1921,101 @@ def rps_status():
             "state": rps_state,
             "player": rps_player_move or "—",
             "computer": rps_computer_move or "—",
-            "winner": rps_winner
+            "winner": rps_winner,
+            "confidence": round(rps_confidence, 2),
+            "players": RPS_PLAYERS
         })
 
 # ======================================================
 # RUN
 # ======================================================
+# "production": async ASGI server (uvicorn), falling back to a threaded
+# production server (waitress) and then Flask's threaded server.
+# "dev": Flask development server with the debugger.
+SERVE_MODE = os.environ.get("ROBOT_SERVE_MODE", "production")
+SERVER_HOST = "0.0.0.0"   # Listen on all interfaces so the tablet can connect
+SERVER_PORT = 5000
+
+STREAM_ROUTES = {
+    "/air/video": air_stream,
+    "/face/video": face_stream,
+    "/rps/video_feed": rps_stream
+}
+
+def create_asgi_app():
+    """
+    ASGI entry point: MJPEG streams are served as async iterators straight
+    from the StreamHubs, everything else goes through the Flask app.
+    """
+    try:
+        from a2wsgi import WSGIMiddleware
+        flask_asgi = WSGIMiddleware(app)
+    except ImportError:
+        from asgiref.wsgi import WsgiToAsgi
+        flask_asgi = WsgiToAsgi(app)
+
+    async def asgi_app(scope, receive, send):
+        hub = STREAM_ROUTES.get(scope.get("path")) if scope["type"] == "http" else None
+        if hub is None:
+            await flask_asgi(scope, receive, send)
+            return
+
+        disconnected = asyncio.Event()
+
+        async def watch_disconnect():
+            while (await receive())["type"] != "http.disconnect":
+                pass
+            disconnected.set()
+
+        watcher = asyncio.create_task(watch_disconnect())
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"multipart/x-mixed-replace; boundary=frame"),
+                (b"cache-control", b"no-cache, no-store")
+            ]
+        })
+        # Ends the stream on disconnect even if the pipeline stops producing
+        frames = hub.astream(disconnected)
+        try:
+            async for chunk in frames:
+                if disconnected.is_set():
+                    break
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        except OSError:
+            pass  # Client went away mid-write
+        finally:
+            await frames.aclose()
+            watcher.cancel()
+
+    return asgi_app
+
+def serve_production(host=SERVER_HOST, port=SERVER_PORT):
+    try:
+        import uvicorn
+        asgi_app = create_asgi_app()
+        print(f"[OK] Serving with uvicorn (ASGI) on {host}:{port}")
+        uvicorn.run(asgi_app, host=host, port=port, log_level="warning")
+        return
+    except ImportError as e:
+        print(f"[SERVER] ASGI server unavailable ({e}), trying waitress...")
+
+    try:
+        from waitress import serve
+        print(f"[OK] Serving with waitress on {host}:{port}")
+        # Each open MJPEG stream holds one of these worker threads for as long as it
+        # is watched, so past 32 viewers further requests queue until one leaves
+        serve(app, host=host, port=port, threads=32, channel_timeout=3600)
+        return
+    except ImportError:
+        print("[SERVER] waitress unavailable, using Flask threaded server without debug")
+
+    app.run(host=host, port=port, debug=False, threaded=True, use_reloader=False)
+
 if __name__ == "__main__":
-    # The '0.0.0.0' tells the computer to listen to your tablet
-    # The '0.0.0.0' tells the computer to listen to your tablet
-    # use_reloader=False is CRITICAL for camera apps on Windows to prevent double-execution/locking
-    app.run(host='0.0.0.0', port=5000, debug=True, use_reloader=False)
+    if SERVE_MODE == "dev":
+        # use_reloader=False is CRITICAL for camera apps on Windows to prevent double-execution/locking
+        app.run(host=SERVER_HOST, port=SERVER_PORT, debug=True, use_reloader=False)
+    else:
+        serve_production()